@@ -1,12 +1,19 @@
 # backend/app/bria_client.py
 
-import time
-import json
-from typing import Optional, Dict, Any
+import asyncio
+import hashlib
+import logging
+import random
+from typing import Optional, Dict, Any, Union
 
 import httpx
+import orjson
+from cachetools import TTLCache
 
 from .config import settings
+from .retry import retry_transient, retry_unsent
+
+logger = logging.getLogger(__name__)
 
 
 class BriaFiboError(Exception):
@@ -14,7 +21,138 @@ class BriaFiboError(Exception):
     pass
 
 
-def generate_image_with_fibo(
+# Shared async client so connections (TCP + TLS) are pooled across requests
+# and repeat status polls reuse one multiplexed HTTP/2 connection.
+# Closed from the FastAPI lifespan handler via `close_client()`.
+_client = httpx.AsyncClient(
+    http2=True,
+    base_url=settings.bria_base_url,
+    headers={
+        "api_token": settings.bria_api_key,
+        "Content-Type": "application/json",
+    },
+    timeout=httpx.Timeout(30, connect=5),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+
+# Status polling backoff: start fast so quick jobs are picked up promptly,
+# then back off so long-running jobs don't hammer the status endpoint.
+# Initial and max delays come from settings.bria_poll_interval_*.
+POLL_BACKOFF_FACTOR = 1.5
+
+
+def _poll_delay(attempt: int) -> float:
+    """Exponential backoff (with a little jitter) for the given poll attempt."""
+    delay = min(
+        settings.bria_poll_interval_max,
+        settings.bria_poll_interval_initial * POLL_BACKOFF_FACTOR ** attempt,
+    )
+    return delay * random.uniform(0.9, 1.1)
+
+
+# Identical generations are coalesced: concurrent callers share the in-flight
+# job, and finished results are reused for a few minutes.
+_inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+_results: "TTLCache[str, Dict[str, Any]]" = TTLCache(maxsize=256, ttl=300)
+
+
+async def _send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request on the shared client, raising for 429 / 5xx."""
+    resp = await _client.request(method, url, **kwargs)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        resp.raise_for_status()
+    return resp
+
+
+@retry_transient
+async def _request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Idempotent request (status polls), retrying 429 / 5xx / network errors."""
+    return await _send(method, url, **kwargs)
+
+
+@retry_unsent
+async def _submit(url: str, **kwargs: Any) -> httpx.Response:
+    """POST a new generation, retrying only if Bria can't have started it."""
+    return await _send("POST", url, **kwargs)
+
+
+async def warm_up(timeout: float) -> None:
+    """
+    Open a connection to Bria (DNS + TCP + TLS + HTTP/2) ahead of the first
+    real request, giving up after `timeout` seconds. Failures are logged and
+    otherwise ignored.
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            await _client.head(settings.bria_base_url)
+    except (httpx.HTTPError, TimeoutError) as e:
+        logger.warning("Bria warm-up failed: %s", e)
+
+
+async def close_client() -> None:
+    """Close the shared Bria HTTP client (call on app shutdown)."""
+    await _client.aclose()
+
+
+def _request_key(
+    prompt: Optional[str],
+    structured_prompt: Optional[Union[Dict[str, Any], str]],
+) -> str:
+    raw = orjson.dumps([prompt, structured_prompt], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+async def generate_image_with_fibo(
+    prompt: Optional[str] = None,
+    structured_prompt: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Generate an image with Bria FIBO, sharing work between identical requests.
+
+    A request that matches one already in flight waits for that job instead
+    of submitting a duplicate; a request that matches one completed in the
+    last few minutes is answered from cache. See `_generate_image_with_fibo`
+    for arguments and return value.
+    """
+    if not prompt and not structured_prompt:
+        raise ValueError("Either prompt or structured_prompt must be provided")
+
+    key = _request_key(prompt, structured_prompt)
+
+    cached = _results.get(key)
+    if cached is not None:
+        return cached
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    fut: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+    # Avoid "exception was never retrieved" warnings when nobody else is waiting.
+    fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = fut
+    try:
+        result = await _generate_image_with_fibo(prompt, structured_prompt)
+    except asyncio.CancelledError:
+        # Followers weren't cancelled themselves; fail them with a normal
+        # error instead of propagating our cancellation to them.
+        fut.set_exception(
+            BriaFiboError("Shared Bria generation was cancelled; please retry")
+        )
+        raise
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    else:
+        _results[key] = result
+        fut.set_result(result)
+        return result
+    finally:
+        del _inflight[key]
+
+
+async def _generate_image_with_fibo(
     prompt: Optional[str] = None,
     structured_prompt: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
@@ -32,17 +170,6 @@ def generate_image_with_fibo(
             - structured_prompt: dict
             - request_id: str
     """
-    if not prompt and not structured_prompt:
-        raise ValueError("Either prompt or structured_prompt must be provided")
-
-    headers = {
-        "api_token": settings.bria_api_key,
-        "Content-Type": "application/json",
-    }
-
-    base = settings.bria_api_base.rstrip("/")
-    submit_url = f"{base}/image/generate"
-
     payload: Dict[str, Any] = {
         "num_results": 1,
     }
@@ -53,14 +180,14 @@ def generate_image_with_fibo(
     if structured_prompt is not None:
         # Bria expects structured_prompt as a STRING containing JSON
         if isinstance(structured_prompt, dict):
-            payload["structured_prompt"] = json.dumps(structured_prompt)
+            payload["structured_prompt"] = orjson.dumps(structured_prompt).decode()
         else:
             # if caller already passed a JSON string, just forward it
             payload["structured_prompt"] = structured_prompt
 
     # ---- Step 1: submit generation request ----
     try:
-        resp = httpx.post(submit_url, json=payload, headers=headers, timeout=30)
+        resp = await _submit(settings.bria_submit_url, json=payload)
     except Exception as e:
         raise BriaFiboError(f"Error contacting Bria generate endpoint: {e}") from e
 
@@ -69,7 +196,7 @@ def generate_image_with_fibo(
             f"Bria submit error {resp.status_code}: {resp.text}"
         )
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     request_id = data.get("request_id")
     status_url = data.get("status_url")
@@ -79,10 +206,35 @@ def generate_image_with_fibo(
             f"Bria submit response missing status_url or request_id: {data}"
         )
 
-    # ---- Step 2: poll status until COMPLETED ----
+    # ---- Step 2: poll status until COMPLETED (bounded by bria_max_wait_s) ----
+    try:
+        async with asyncio.timeout(settings.bria_max_wait_s):
+            return await _poll_until_done(request_id, status_url)
+    except TimeoutError as e:
+        raise BriaFiboError(
+            f"Bria job {request_id} exceeded max wait of {settings.bria_max_wait_s}s"
+        ) from e
+
+
+async def _poll_until_done(request_id: str, status_url: str) -> Dict[str, Any]:
+    """Poll a submitted Bria job until it completes or errors."""
+    # While a job is in progress Bria keeps returning the same body, so skip
+    # decoding it when the server says it hasn't changed (ETag / 304) or, if
+    # ETags aren't honored, when its hash matches the previous poll.
+    attempt = 0
+    etag: Optional[str] = None
+    last_digest: Optional[bytes] = None
     while True:
+        if attempt:
+            await asyncio.sleep(_poll_delay(attempt - 1))
+        attempt += 1
+
         try:
-            status_resp = httpx.get(status_url, headers=headers, timeout=30)
+            status_resp = await _request(
+                "GET",
+                status_url,
+                headers={"If-None-Match": etag} if etag else None,
+            )
         except Exception as e:
             raise BriaFiboError(f"Error contacting Bria status endpoint: {e}") from e
 
@@ -91,7 +243,16 @@ def generate_image_with_fibo(
                 f"Bria status error {status_resp.status_code}: {status_resp.text}"
             )
 
-        sd = status_resp.json()
+        if status_resp.status_code == 304:
+            continue
+
+        etag = status_resp.headers.get("etag") or etag
+        digest = hashlib.blake2b(status_resp.content, digest_size=16).digest()
+        if digest == last_digest:
+            continue
+        last_digest = digest
+
+        sd = orjson.loads(status_resp.content)
         status = sd.get("status", "")
 
         if status.upper() == "COMPLETED":
@@ -106,7 +267,7 @@ def generate_image_with_fibo(
                 structured_parsed = structured_raw
             elif isinstance(structured_raw, str):
                 try:
-                    structured_parsed = json.loads(structured_raw)
+                    structured_parsed = orjson.loads(structured_raw)
                 except Exception:
                     # If parsing fails, keep it as empty dict to avoid breaking callers
                     structured_parsed = {}
@@ -124,6 +285,3 @@ def generate_image_with_fibo(
 
         if status.upper() == "ERROR":
             raise BriaFiboError(f"Bria generation error: {sd}")
-
-        # Still in progress
-        time.sleep(2)
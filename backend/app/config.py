@@ -1,18 +1,44 @@
 # backend/app/config.py
+from functools import cached_property
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     bria_api_key: str
     bria_api_base: str = "https://engine.prod.bria-api.com/v2"
+    bria_max_wait_s: int = 180
+    bria_poll_interval_initial: float = 0.5
+    bria_poll_interval_max: float = 15.0
 
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
+    openai_concurrency: int = 8
+    openai_embedding_model: str = "text-embedding-3-small"
+    # Routes requests sharing our static prompt prefix to the same cache shard
+    openai_prompt_cache_key: str = "cinefibo"
+
+    # Serve near-duplicate scene texts from cache (cosine similarity threshold)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.95
+
+    # Concurrent coverage requests are merged into one completion: up to
+    # this many scenes, waiting at most this long for company (0 disables)
+    coverage_batch_max_size: int = 8
+    coverage_batch_max_wait_ms: int = 50
 
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
     )
 
+    @cached_property
+    def bria_base_url(self) -> str:
+        return self.bria_api_base.rstrip("/")
+
+    @cached_property
+    def bria_submit_url(self) -> str:
+        return f"{self.bria_base_url}/image/generate"
+
 
 settings = Settings()
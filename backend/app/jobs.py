@@ -0,0 +1,100 @@
+# backend/app/jobs.py
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Dict, List, Optional, Set
+
+from cachetools import TTLCache
+
+from .bria_client import generate_image_with_fibo, BriaFiboError
+from .shot_service import plan_coverage_shots_batch
+
+
+# Job states, mirroring Bria's own status values.
+JOB_IN_PROGRESS = "IN_PROGRESS"
+JOB_COMPLETED = "COMPLETED"
+JOB_ERROR = "ERROR"
+
+# In-memory job table (per worker). Finished jobs expire after a day, which
+# also covers OpenAI Batch API jobs (24h completion window).
+_jobs: "TTLCache[str, Dict[str, Any]]" = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+# Strong refs so running tasks aren't garbage-collected mid-flight.
+_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def submit_job(
+    prompt: Optional[str] = None,
+    structured_prompt: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Start a Bria generation in the background and return its job id
+    immediately. Poll `get_job` for the outcome.
+    """
+    if not prompt and not structured_prompt:
+        raise ValueError("Either prompt or structured_prompt must be provided")
+
+    return _start_job(
+        generate_image_with_fibo(prompt=prompt, structured_prompt=structured_prompt)
+    )
+
+
+def submit_coverage_plan_job(
+    scenes: List[str],
+    num_shots: int = 6,
+    project_type: Optional[str] = None,
+) -> str:
+    """
+    Plan coverage for many scenes via the OpenAI Batch API in the background.
+    The finished job carries `plans`, one shot list per scene.
+    """
+    return _start_job(_plan_batch(scenes, num_shots, project_type))
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the current state of a job, or None if unknown/expired."""
+    return _jobs.get(job_id)
+
+
+async def cancel_jobs() -> None:
+    """Cancel all running jobs (call on app shutdown)."""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+
+
+def _start_job(work: Awaitable[Dict[str, Any]]) -> str:
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {"job_id": job_id, "status": JOB_IN_PROGRESS}
+
+    task = asyncio.create_task(_run_job(job_id, work))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+    return job_id
+
+
+async def _plan_batch(
+    scenes: List[str],
+    num_shots: int,
+    project_type: Optional[str],
+) -> Dict[str, Any]:
+    plans = await plan_coverage_shots_batch(
+        scenes, num_shots=num_shots, project_type=project_type
+    )
+    return {"plans": plans}
+
+
+async def _run_job(job_id: str, work: Awaitable[Dict[str, Any]]) -> None:
+    try:
+        result = await work
+    except BriaFiboError as e:
+        _jobs[job_id] = {"job_id": job_id, "status": JOB_ERROR, "error": str(e)}
+    except Exception as e:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "status": JOB_ERROR,
+            "error": f"Unexpected error: {e}",
+        }
+    else:
+        _jobs[job_id] = {"job_id": job_id, "status": JOB_COMPLETED, **result}
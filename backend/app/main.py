@@ -1,14 +1,27 @@
 # backend/app/main.py
 
-from copy import deepcopy
-from typing import Any, Dict, Optional, List
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, List, Literal, Tuple
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 
-from .bria_client import generate_image_with_fibo, BriaFiboError
-from .shot_service import build_shot_prompt, plan_coverage_shots
+from . import bria_client, shot_service
+from .bria_client import generate_image_with_fibo, BriaFiboError, close_client
+from .jobs import submit_job, submit_coverage_plan_job, get_job, cancel_jobs
+from .shot_service import (
+    build_shot_prompt,
+    plan_coverage_shots,
+    plan_coverage_shots_multi,
+    stream_coverage_shots,
+    clear_caches,
+    cache_stats,
+)
 
 
 # ---------- Pydantic models ----------
@@ -20,7 +33,7 @@ class FiboGenerateRequest(BaseModel):
 
 class FiboGenerateResponse(BaseModel):
     image_url: str
-    structured_prompt: Dict[str, Any]
+    structured_prompt: dict
     request_id: str
 
 
@@ -29,17 +42,21 @@ class ShotGenerateRequest(BaseModel):
         ...,
         description="Raw scene text or description from which to craft a camera-aware cinematic shot prompt.",
     )
+    cache: bool = Field(
+        True,
+        description="Reuse a cached shot prompt for the same (or a near-identical) scene.",
+    )
 
 
 class ShotGenerateResponse(BaseModel):
     shot_prompt: str
     image_url: str
-    structured_prompt: Dict[str, Any]
+    structured_prompt: dict
     request_id: str
 
 
 class ShotTuneRequest(BaseModel):
-    structured_prompt: Dict[str, Any] = Field(
+    structured_prompt: dict = Field(
         ...,
         description="Existing structured prompt JSON returned from FIBO.",
     )
@@ -62,7 +79,7 @@ class ShotTuneRequest(BaseModel):
 
 class ShotTuneResponse(BaseModel):
     image_url: str
-    structured_prompt: Dict[str, Any]
+    structured_prompt: dict
     request_id: str
 
 
@@ -96,12 +113,16 @@ class CoverageGenerateRequest(BaseModel):
             "'YouTube game show', 'TikTok sketch', 'commercial', 'documentary interview'."
         ),
     )
+    cache: bool = Field(
+        True,
+        description="Reuse a cached coverage plan for the same (or a near-identical) scene.",
+    )
 
 
 class CoverageShotResult(BaseModel):
     plan: CoverageShotPlan
     image_url: str
-    structured_prompt: Dict[str, Any]
+    structured_prompt: dict
     request_id: str
 
 
@@ -109,9 +130,86 @@ class CoverageGenerateResponse(BaseModel):
     shots: List[CoverageShotResult]
 
 
+class JobSubmitRequest(BaseModel):
+    prompt: Optional[str] = Field(
+        None, description="Natural language prompt to send to FIBO."
+    )
+    structured_prompt: Optional[dict] = Field(
+        None, description="Optional structured prompt JSON to send to FIBO."
+    )
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    image_url: Optional[str] = None
+    structured_prompt: Optional[dict] = None
+    request_id: Optional[str] = None
+    plans: Optional[List[List[dict]]] = None
+    error: Optional[str] = None
+
+
+class CoveragePlanRequest(BaseModel):
+    scenes: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Scene descriptions to plan coverage for.",
+    )
+    num_shots: int = Field(
+        6,
+        ge=1,
+        le=12,
+        description="How many coverage shots to plan per scene.",
+    )
+    project_type: Optional[str] = Field(
+        None,
+        description="Optional: type of production (see CoverageGenerateRequest).",
+    )
+    mode: Literal["sync", "batch"] = Field(
+        "sync",
+        description=(
+            "'sync' plans in real time and returns plans directly; 'batch' uses "
+            "the OpenAI Batch API (about half the cost, up to 24h) and returns "
+            "a job_id to poll at /api/jobs/{job_id}."
+        ),
+    )
+
+
+class CoveragePlanResponse(BaseModel):
+    mode: str
+    plans: Optional[List[List[dict]]] = None
+    job_id: Optional[str] = None
+
+
 # ---------- FastAPI setup ----------
 
-app = FastAPI(title="CineFIBO Backend", version="0.1.0")
+# Startup warm-up must never hold the server up for long.
+WARM_UP_TIMEOUT = 5.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker warms its own pools so the first user request doesn't pay
+    # for DNS + TLS handshakes to OpenAI and Bria.
+    await asyncio.gather(
+        shot_service.warm_up(WARM_UP_TIMEOUT),
+        bria_client.warm_up(WARM_UP_TIMEOUT),
+    )
+    yield
+    await cancel_jobs()
+    await close_client()
+
+
+app = FastAPI(
+    title="CineFIBO Backend",
+    version="0.1.0",
+    lifespan=lifespan,
+)
 
 # Open CORS for local dev; you can tighten this later if needed.
 app.add_middleware(
@@ -123,21 +221,46 @@ app.add_middleware(
 )
 
 
+# Max number of coverage Bria jobs this process runs at once, across all
+# requests (tune to your Bria rate limit).
+COVERAGE_MAX_PARALLEL = 4
+_coverage_sem = asyncio.Semaphore(COVERAGE_MAX_PARALLEL)
+
+
 # ---------- Helpers for tuning ----------
 
-CAMERA_ANGLE_DESCRIPTIONS: Dict[str, str] = {
+# Keys are interned; request values are looked up as-is (interning them would
+# make every distinct client string immortal).
+CAMERA_ANGLE_DESCRIPTIONS: Dict[str, str] = {sys.intern(k): v for k, v in {
     "eye-level": "an eye-level camera angle, placing the viewer at the character's eye line",
     "low-angle": "a low-angle shot looking up at the subject, making them feel powerful and dominant",
     "high-angle": "a high-angle shot looking down on the subject, making them feel small or vulnerable",
     "top-down": "a top-down, overhead camera angle",
-}
+}.items()}
 
-LENS_DESCRIPTIONS: Dict[str, str] = {
+LENS_DESCRIPTIONS: Dict[str, str] = {sys.intern(k): v for k, v in {
     "24mm wide-angle": "a 24mm wide-angle lens that emphasizes space and environment",
     "35mm": "a 35mm lens that balances subject and environment",
     "50mm": "a 50mm lens for a natural, cinematic perspective",
     "85mm close-up": "an 85mm telephoto lens for intimate, compressed close-ups",
-}
+}.items()}
+
+COND_DRAMATIC = sys.intern("low-key, dramatic lighting with strong contrast between light and shadow")
+SHAD_DRAMATIC = sys.intern("deep, pronounced shadows that add tension and mystery")
+COND_BRIGHT = sys.intern("bright, high-key lighting that fills the space with energy")
+SHAD_BRIGHT = sys.intern("very soft, minimal shadows to keep the mood light")
+COND_MELANCHOLIC = sys.intern("soft, dim lighting with cool or muted tones")
+SHAD_MELANCHOLIC = sys.intern("gentle but noticeable shadows that add introspection")
+COND_SERENE = sys.intern("warm, soft lighting that feels intimate and inviting")
+SHAD_SERENE = sys.intern("soft, diffuse shadows that wrap gently around forms")
+
+# (mood keywords, lighting conditions, shadows) -- first match wins.
+MOOD_LIGHTING_TABLE: Tuple[Tuple[Tuple[str, ...], str, str], ...] = (
+    (("dramatic", "tense"), COND_DRAMATIC, SHAD_DRAMATIC),
+    (("bright", "energetic"), COND_BRIGHT, SHAD_BRIGHT),
+    (("melancholic", "quiet"), COND_MELANCHOLIC, SHAD_MELANCHOLIC),
+    (("serene", "cozy"), COND_SERENE, SHAD_SERENE),
+)
 
 
 def apply_shot_overrides(
@@ -148,11 +271,14 @@ def apply_shot_overrides(
     Apply high-level user controls onto the structured_prompt in a coherent way,
     touching camera, aesthetics, and lighting together.
     """
-    sp = deepcopy(structured_prompt)
-
-    photo = sp.setdefault("photographic_characteristics", {})
-    aesthetics = sp.setdefault("aesthetics", {})
-    lighting = sp.setdefault("lighting", {})
+    # Only these three sections are mutated, so copy them one level deep and
+    # share everything else with the caller's dict (much cheaper than deepcopy).
+    sp = {**structured_prompt}
+    photo = sp["photographic_characteristics"] = {
+        **(sp.get("photographic_characteristics") or {})
+    }
+    aesthetics = sp["aesthetics"] = {**(sp.get("aesthetics") or {})}
+    lighting = sp["lighting"] = {**(sp.get("lighting") or {})}
 
     # ---- Camera angle ----
     if req.camera_angle:
@@ -172,42 +298,12 @@ def apply_shot_overrides(
         aesthetics["mood_atmosphere"] = mood
 
         # Tie lighting to mood a bit more aggressively
-        if "dramatic" in mood or "tense" in mood:
-            lighting.setdefault(
-                "conditions",
-                "low-key, dramatic lighting with strong contrast between light and shadow",
-            )
-            lighting.setdefault(
-                "shadows",
-                "deep, pronounced shadows that add tension and mystery",
-            )
-        elif "bright" in mood or "energetic" in mood:
-            lighting.setdefault(
-                "conditions",
-                "bright, high-key lighting that fills the space with energy",
-            )
-            lighting.setdefault(
-                "shadows",
-                "very soft, minimal shadows to keep the mood light",
-            )
-        elif "melancholic" in mood or "quiet" in mood:
-            lighting.setdefault(
-                "conditions",
-                "soft, dim lighting with cool or muted tones",
-            )
-            lighting.setdefault(
-                "shadows",
-                "gentle but noticeable shadows that add introspection",
-            )
-        elif "serene" in mood or "cozy" in mood:
-            lighting.setdefault(
-                "conditions",
-                "warm, soft lighting that feels intimate and inviting",
-            )
-            lighting.setdefault(
-                "shadows",
-                "soft, diffuse shadows that wrap gently around forms",
-            )
+        mood_lc = mood.lower()
+        for keywords, conditions, shadows in MOOD_LIGHTING_TABLE:
+            if any(k in mood_lc for k in keywords):
+                lighting.setdefault("conditions", conditions)
+                lighting.setdefault("shadows", shadows)
+                break
 
     # ---- Color scheme ----
     if req.color_scheme:
@@ -216,6 +312,9 @@ def apply_shot_overrides(
     return sp
 
 
+_DEFAULT_PROMPT = "A cinematic, well-composed shot suitable for film pre-production."
+
+
 def build_prompt_from_structured_prompt(sp: Dict[str, Any]) -> str:
     """
     Turn the structured prompt into a strong, camera-aware text prompt
@@ -231,34 +330,15 @@ def build_prompt_from_structured_prompt(sp: Dict[str, Any]) -> str:
     angle = photo.get("camera_angle")
     lens = photo.get("lens_focal_length")
 
-    parts = []
-
-    if short:
-        parts.append(short)
-    elif context:
-        parts.append(context)
-
-    camera_bits = []
-    if angle:
-        camera_bits.append(str(angle))
-    if lens:
-        camera_bits.append(str(lens))
-
-    if camera_bits:
-        parts.append("The shot uses " + " and ".join(camera_bits) + ".")
+    camera_bits = [str(b) for b in (angle, lens) if b]
+    look_bits = [str(b) for b in (mood, f"with {color}" if color else None) if b]
 
-    look_bits = []
-    if mood:
-        look_bits.append(str(mood))
-    if color:
-        look_bits.append(f"with {color}")
-    if look_bits:
-        parts.append("The overall look is " + ", ".join(look_bits) + ".")
-
-    if not parts:
-        return "A cinematic, well-composed shot suitable for film pre-production."
-
-    return " ".join(parts)
+    parts = (
+        short or context,
+        f"The shot uses {' and '.join(camera_bits)}." if camera_bits else "",
+        f"The overall look is {', '.join(look_bits)}." if look_bits else "",
+    )
+    return " ".join(p for p in parts if p) or _DEFAULT_PROMPT
 
 
 # ---------- Routes ----------
@@ -268,13 +348,30 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.post("/api/admin/clear-caches")
+def admin_clear_caches():
+    """
+    Drop memoized OpenAI shot prompts and coverage plans.
+    """
+    clear_caches()
+    return {"status": "ok"}
+
+
+@app.get("/api/admin/cache-stats")
+def admin_cache_stats():
+    """
+    Hit/miss counters for the OpenAI response caches.
+    """
+    return cache_stats()
+
+
 @app.post("/api/fibo/generate", response_model=FiboGenerateResponse)
-def fibo_generate(req: FiboGenerateRequest):
+async def fibo_generate(req: FiboGenerateRequest):
     """
     Simple pass-through endpoint to call Bria FIBO with a natural language prompt.
     """
     try:
-        result = generate_image_with_fibo(prompt=req.prompt)
+        result = await generate_image_with_fibo(prompt=req.prompt)
     except BriaFiboError as e:
         raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
@@ -287,8 +384,35 @@ def fibo_generate(req: FiboGenerateRequest):
     )
 
 
+@app.post("/api/jobs", response_model=JobSubmitResponse, status_code=202)
+async def job_submit(req: JobSubmitRequest):
+    """
+    Start a FIBO generation in the background and return a job id right away.
+    Poll GET /api/jobs/{job_id} for the result.
+    """
+    if not req.prompt and not req.structured_prompt:
+        raise HTTPException(
+            status_code=400, detail="prompt or structured_prompt is required."
+        )
+
+    job_id = submit_job(prompt=req.prompt, structured_prompt=req.structured_prompt)
+    return JobSubmitResponse(job_id=job_id, status=get_job(job_id)["status"])
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def job_status(job_id: str):
+    """
+    Return the current state of a background FIBO job.
+    """
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id.")
+
+    return JobStatusResponse(**job)
+
+
 @app.post("/api/shot/generate", response_model=ShotGenerateResponse)
-def shot_generate(req: ShotGenerateRequest):
+async def shot_generate(req: ShotGenerateRequest):
     """
     Takes raw scene text, asks OpenAI to craft a camera-aware cinematic shot prompt,
     then renders that shot with FIBO.
@@ -298,10 +422,10 @@ def shot_generate(req: ShotGenerateRequest):
 
     try:
         # 1) Use OpenAI to derive a camera-aware prompt
-        shot_prompt = build_shot_prompt(req.scene_text)
+        shot_prompt = await build_shot_prompt(req.scene_text, cache=req.cache)
 
         # 2) Call FIBO with that prompt
-        result = generate_image_with_fibo(prompt=shot_prompt)
+        result = await generate_image_with_fibo(prompt=shot_prompt)
     except BriaFiboError as e:
         raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
@@ -316,7 +440,7 @@ def shot_generate(req: ShotGenerateRequest):
 
 
 @app.post("/api/shot/tune", response_model=ShotTuneResponse)
-def shot_tune(req: ShotTuneRequest):
+async def shot_tune(req: ShotTuneRequest):
     """
     Takes an existing structured_prompt plus user overrides for camera / mood / color,
     applies the changes coherently, and regenerates the shot via FIBO using both
@@ -330,7 +454,7 @@ def shot_tune(req: ShotTuneRequest):
         prompt_text = build_prompt_from_structured_prompt(updated_sp)
 
         # Send BOTH prompt + structured_prompt to FIBO
-        result = generate_image_with_fibo(
+        result = await generate_image_with_fibo(
             prompt=prompt_text,
             structured_prompt=updated_sp,
         )
@@ -346,14 +470,79 @@ def shot_tune(req: ShotTuneRequest):
     )
 
 
-@app.post("/api/shot/coverage", response_model=CoverageGenerateResponse)
-def shot_coverage(req: CoverageGenerateRequest):
+@app.post("/api/coverage/plan", response_model=CoveragePlanResponse)
+async def coverage_plan(req: CoveragePlanRequest):
+    """
+    Plan coverage (no image generation) for one or more scenes.
+
+    In 'sync' mode scenes are planned in a few multi-scene completions and
+    returned directly.
+    In 'batch' mode they go through the OpenAI Batch API as a background job.
+    """
+    if any(not s or not s.strip() for s in req.scenes):
+        raise HTTPException(status_code=400, detail="scenes cannot contain empty text.")
+
+    if req.mode == "batch":
+        job_id = submit_coverage_plan_job(
+            req.scenes, num_shots=req.num_shots, project_type=req.project_type
+        )
+        return CoveragePlanResponse(mode=req.mode, job_id=job_id)
+
+    try:
+        plans = await plan_coverage_shots_multi(
+            req.scenes, num_shots=req.num_shots, project_type=req.project_type
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return CoveragePlanResponse(mode=req.mode, plans=plans)
+
+
+@app.post("/api/shot/coverage/plan-stream")
+async def shot_coverage_plan_stream(req: CoverageGenerateRequest):
+    """
+    Stream a coverage plan (no images) as server-sent events.
+
+    Each planned shot is sent as a `data:` event as soon as the model has
+    written it, followed by a final `event: done`. Errors are reported as
+    `event: error`. Disconnecting stops the underlying OpenAI stream.
+    """
+    if not req.scene_text or not req.scene_text.strip():
+        raise HTTPException(status_code=400, detail="scene_text cannot be empty.")
+
+    async def events():
+        try:
+            async for shot in stream_coverage_shots(
+                scene_text=req.scene_text,
+                num_shots=req.num_shots,
+                project_type=req.project_type,
+                cache=req.cache,
+            ):
+                yield b"data: " + orjson.dumps(shot) + b"\n\n"
+        except Exception as e:
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# Returns orjson-encoded bytes directly: the structured prompts are opaque Bria JSON,
+# so re-validating them through a response_model is pure overhead.
+# The documented schema is still CoverageGenerateResponse.
+@app.post(
+    "/api/shot/coverage",
+    response_model=None,
+    responses={200: {"model": CoverageGenerateResponse}},
+)
+async def shot_coverage(req: CoverageGenerateRequest):
     """
     Generate a multi-shot coverage pack for a scene.
 
     1. Uses OpenAI to plan N coverage shots (with camera, lens, lighting notes),
        adapted to the production type if provided.
-    2. For each planned shot, builds a FIBO prompt and renders an image.
+    2. For each planned shot, builds a FIBO prompt and renders the images
+       concurrently (bounded by COVERAGE_MAX_PARALLEL).
     3. Returns the plan + generated image + structured_prompt per shot.
     """
     if not req.scene_text or not req.scene_text.strip():
@@ -361,41 +550,66 @@ def shot_coverage(req: CoverageGenerateRequest):
 
     try:
         # Step 1: get abstract coverage plan from OpenAI (aware of project_type)
-        plan_shots = plan_coverage_shots(
+        plan_shots = await plan_coverage_shots(
             scene_text=req.scene_text,
             num_shots=req.num_shots,
             project_type=req.project_type,
+            cache=req.cache,
         )
 
-        results: List[CoverageShotResult] = []
+        results: List[Dict[str, Any]] = []
 
         # Optional contextual string for the FIBO prompt
         production_context = (
-            f"This frame is for a {req.project_type}."
+            f" This frame is for a {req.project_type}."
             if req.project_type
             else ""
         )
 
-        # Step 2: call FIBO once per shot
-        for shot in plan_shots:
-            prompt_text_parts = [
-                shot.get("description", ""),
-                f"Shot type: {shot.get('shot_type', '')}.",
-                f"Framing: {shot.get('framing', '')}.",
-                f"Camera angle: {shot.get('camera_angle', '')}.",
-                f"Lens: {shot.get('lens', '')}.",
-                f"Lighting: {shot.get('lighting', '')}.",
-                production_context,
-                "High-quality, production-ready frame.",
-            ]
-
-            prompt_text = " ".join(p for p in prompt_text_parts if p)
+        prompt_texts: List[str] = [
+            (
+                f"{shot.get('description', '')}"
+                f" Shot type: {shot.get('shot_type', '')}."
+                f" Framing: {shot.get('framing', '')}."
+                f" Camera angle: {shot.get('camera_angle', '')}."
+                f" Lens: {shot.get('lens', '')}."
+                f" Lighting: {shot.get('lighting', '')}."
+                f"{production_context}"
+                " High-quality, production-ready frame."
+            ).lstrip()
+            for shot in plan_shots
+        ]
+
+        # Step 2: call FIBO for all shots concurrently, capped process-wide so
+        # we stay within Bria's rate limits.
+        async def render(prompt_text: str) -> Dict[str, Any]:
+            async with _coverage_sem:
+                return await generate_image_with_fibo(prompt=prompt_text)
+
+        fibo_results = await asyncio.gather(
+            *(render(pt) for pt in prompt_texts),
+            return_exceptions=True,
+        )
 
-            fibo_res = generate_image_with_fibo(prompt=prompt_text)
+        failures = [
+            (shot, res)
+            for shot, res in zip(plan_shots, fibo_results)
+            if isinstance(res, BaseException)
+        ]
+        for _, err in failures:
+            if not isinstance(err, BriaFiboError):
+                raise err
+        if failures:
+            raise BriaFiboError(
+                "; ".join(
+                    f"Shot {shot.get('id', '?')}: {err}" for shot, err in failures
+                )
+            )
 
+        for shot, fibo_res in zip(plan_shots, fibo_results):
             plan_obj = CoverageShotPlan(
                 id=int(shot.get("id", 0) or 0),
-                label=shot.get("label", f"Shot {shot.get('id', '')}"),
+                label=shot.get("label") or f"Shot {shot.get('id', '')}",
                 shot_type=shot.get("shot_type", ""),
                 description=shot.get("description", ""),
                 camera_angle=shot.get("camera_angle", ""),
@@ -406,12 +620,12 @@ def shot_coverage(req: CoverageGenerateRequest):
             )
 
             results.append(
-                CoverageShotResult(
-                    plan=plan_obj,
-                    image_url=fibo_res["image_url"],
-                    structured_prompt=fibo_res["structured_prompt"],
-                    request_id=fibo_res["request_id"],
-                )
+                {
+                    "plan": plan_obj.model_dump(),
+                    "image_url": fibo_res["image_url"],
+                    "structured_prompt": fibo_res["structured_prompt"],
+                    "request_id": fibo_res["request_id"],
+                }
             )
 
     except BriaFiboError as e:
@@ -419,4 +633,12 @@ def shot_coverage(req: CoverageGenerateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    return CoverageGenerateResponse(shots=results)
+    return Response(orjson.dumps({"shots": results}), media_type="application/json")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # "auto" picks uvloop and httptools (from uvicorn[standard]) where available;
+    # uvloop isn't on Windows.
+    uvicorn.run("app.main:app", port=8000, loop="auto", http="auto")
@@ -0,0 +1,166 @@
+# backend/app/response_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[List[float]]]
+
+
+def cache_key(**parts: Any) -> str:
+    """Stable SHA-256 key for a set of request parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier in-memory cache for LLM responses.
+
+    - Exact tier: LRU keyed on a hash of the full request.
+    - Semantic tier (when an embedder is given): on an exact miss, the request
+      text is embedded and compared (cosine similarity) against previously
+      cached requests in the same namespace, i.e. same model, system prompt
+      and parameters. A match above `threshold` is served from cache.
+
+    Values are deep-copied in and out so callers can mutate results freely.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        embed: Optional[Embedder] = None,
+        threshold: float = 0.95,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._embed = embed
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        # namespace -> (cache keys, L2-normalized embedding matrix). Only keys
+        # still in the exact tier are indexed, so this is bounded by maxsize.
+        self._vectors: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._namespace_of: Dict[str, str] = {}
+        self.stats = {"exact_hit": 0, "semantic_hit": 0, "miss": 0}
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vectors.clear()
+        self._namespace_of.clear()
+
+    def get_exact(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            return None
+        self._entries.move_to_end(key)
+        return deepcopy(value)
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        namespace: Optional[str] = None,
+        vector: Optional[np.ndarray] = None,
+    ) -> None:
+        self._entries[key] = deepcopy(value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            evicted, _ = self._entries.popitem(last=False)
+            self._drop_vector(evicted)
+
+        indexed = key in self._namespace_of
+        if namespace is not None and vector is not None and not indexed:
+            keys, matrix = self._vectors.get(
+                namespace, ([], np.empty((0, vector.shape[0]), dtype=np.float32))
+            )
+            self._vectors[namespace] = (keys + [key], np.vstack([matrix, vector]))
+            self._namespace_of[key] = namespace
+
+    def _drop_vector(self, key: str) -> None:
+        namespace = self._namespace_of.pop(key, None)
+        if namespace is None:
+            return
+        keys, matrix = self._vectors[namespace]
+        i = keys.index(key)
+        if len(keys) == 1:
+            del self._vectors[namespace]
+        else:
+            self._vectors[namespace] = (
+                keys[:i] + keys[i + 1:],
+                np.delete(matrix, i, axis=0),
+            )
+
+    async def get_or_compute(
+        self,
+        key: str,
+        namespace: str,
+        text: str,
+        compute: Callable[[], Awaitable[Any]],
+        use_cache: bool = True,
+    ) -> Any:
+        """
+        Return a cached response for this request, or compute and cache it.
+        With `use_cache=False` the lookup is skipped but the fresh result is
+        still stored.
+
+        The embedding is only awaited before computing when it could produce
+        a semantic hit (the namespace already has indexed vectors); otherwise
+        it is fetched concurrently with the computation, just for indexing.
+        """
+        if use_cache:
+            value = self.get_exact(key)
+            if value is not None:
+                self._count("exact_hit")
+                return value
+
+        if use_cache and namespace in self._vectors:
+            vector = await self._embed_text(text)
+            if vector is not None:
+                value = self._semantic_lookup(namespace, vector)
+                if value is not None:
+                    self._count("semantic_hit")
+                    self.put(key, value)
+                    return value
+            self._count("miss")
+            value = await compute()
+        else:
+            self._count("miss")
+            value, vector = await asyncio.gather(compute(), self._embed_text(text))
+
+        self.put(key, value, namespace=namespace, vector=vector)
+        return value
+
+    async def _embed_text(self, text: str) -> Optional[np.ndarray]:
+        if self._embed is None:
+            return None
+        try:
+            vector = np.asarray(await self._embed(text), dtype=np.float32)
+        except Exception as e:
+            # The semantic tier is best-effort; never fail the request over it.
+            logger.warning("%s cache: embedding failed: %s", self.name, e)
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, namespace: str, vector: np.ndarray) -> Optional[Any]:
+        keys, matrix = self._vectors.get(namespace, ([], None))
+        if not keys:
+            return None
+        sims = matrix @ vector
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        return self.get_exact(keys[best])
+
+    def _count(self, outcome: str) -> None:
+        self.stats[outcome] += 1
+        logger.debug("%s cache %s (%s)", self.name, outcome, self.stats)
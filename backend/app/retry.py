@@ -0,0 +1,73 @@
+# backend/app/retry.py
+
+import httpx
+import openai
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+
+RETRY_ATTEMPTS = 5
+RETRY_MAX_WAIT = 30.0
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, 5xx responses and network errors are worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(
+        exc,
+        (
+            httpx.TransportError,
+            openai.RateLimitError,
+            openai.APIConnectionError,  # includes APITimeoutError
+            openai.InternalServerError,
+        ),
+    )
+
+
+def _is_unsent(exc: BaseException) -> bool:
+    """Errors where the server can't have acted on the request: safe to resend."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code == 429
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def _wait_retry_after(fallback):
+    """Sleep for the server's Retry-After when it sends one, else `fallback`."""
+
+    def wait(retry_state) -> float:
+        exc = retry_state.outcome.exception()
+        response = getattr(exc, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        try:
+            return min(max(float(header), 0.0), RETRY_MAX_WAIT)
+        except (TypeError, ValueError):
+            return fallback(retry_state)
+
+    return wait
+
+
+# Decorator for coroutines that call OpenAI / Bria: up to 5 attempts with
+# jittered exponential backoff, honoring Retry-After. The last error is
+# re-raised unchanged so callers' existing error handling still applies.
+retry_transient = retry(
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    wait=_wait_retry_after(wait_random_exponential(multiplier=1, max=RETRY_MAX_WAIT)),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
+
+# Same schedule for non-idempotent calls (e.g. submitting a Bria generation):
+# only connect failures and 429s are retried, since after a read timeout or
+# 5xx the server may already have started (and billed) the work.
+retry_unsent = retry(
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    wait=_wait_retry_after(wait_random_exponential(multiplier=1, max=RETRY_MAX_WAIT)),
+    retry=retry_if_exception(_is_unsent),
+    reraise=True,
+)
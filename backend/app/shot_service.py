@@ -1,20 +1,121 @@
 # backend/app/shot_service.py
 
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
+import logging
+import re
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar,
+)
 
-from openai import OpenAI
+import msgspec
+from openai import AsyncOpenAI
 from .config import settings
+from .response_cache import ResponseCache, cache_key
+from .retry import retry_transient
 
-client = OpenAI(api_key=settings.openai_api_key)
+logger = logging.getLogger(__name__)
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    _json_loads = json.loads
 
-def build_shot_prompt(scene_text: str) -> str:
+# Retries are handled by `retry_transient`, so the SDK's own are disabled.
+# Every API call (bar the best-effort warm-up) goes through `_call` or
+# `_open_stream` instead.
+client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+
+# Caps concurrent OpenAI requests from this process (tune to your RPM limit).
+_sem = asyncio.Semaphore(settings.openai_concurrency)
+
+T = TypeVar("T")
+
+
+@retry_transient
+async def _call(fn: Callable[..., Awaitable[T]], /, *args: Any, **kwargs: Any) -> T:
+    """One OpenAI API call under the concurrency cap, retried if transient."""
+    async with _sem:
+        return await fn(*args, **kwargs)
+
+
+@retry_transient
+async def _open_stream(body: Dict[str, Any]) -> Any:
     """
-    Turn a single scene/beat into one detailed, camera-aware shot prompt.
-    Used by /api/shot/generate.
+    Open a streamed chat completion, retried if transient. On success the
+    caller owns one `_sem` slot and must release it after closing the stream;
+    like `_call`, no slot is held while backing off between attempts.
     """
-    system_prompt = """
+    await _sem.acquire()
+    try:
+        return await client.chat.completions.create(**body, stream=True)
+    except BaseException:
+        _sem.release()
+        raise
+
+
+async def _embed(text: str) -> List[float]:
+    resp = await _call(
+        client.embeddings.create,
+        model=settings.openai_embedding_model,
+        input=text,
+    )
+    return resp.data[0].embedding
+
+
+# Exact + semantic caches of OpenAI results (see response_cache.py).
+SHOT_PROMPT_CACHE_MAXSIZE = 512
+COVERAGE_CACHE_MAXSIZE = 256
+_embedder = _embed if settings.semantic_cache_enabled else None
+_shot_prompt_cache = ResponseCache(
+    "shot_prompt",
+    SHOT_PROMPT_CACHE_MAXSIZE,
+    embed=_embedder,
+    threshold=settings.semantic_cache_threshold,
+)
+_coverage_cache = ResponseCache(
+    "coverage",
+    COVERAGE_CACHE_MAXSIZE,
+    embed=_embedder,
+    threshold=settings.semantic_cache_threshold,
+)
+
+class Shot(msgspec.Struct, omit_defaults=True):
+    """One planned coverage shot. Missing / null fields are left out."""
+
+    id: Optional[int] = None
+    label: Optional[str] = None
+    shot_type: Optional[str] = None
+    description: Optional[str] = None
+    camera_angle: Optional[str] = None
+    lens: Optional[str] = None
+    framing: Optional[str] = None
+    lighting: Optional[str] = None
+    purpose: Optional[str] = None
+
+
+class CoveragePack(msgspec.Struct):
+    shots: List[Shot] = []
+
+
+def _shots_to_dicts(shots: List[Shot]) -> List[Dict[str, Any]]:
+    for idx, shot in enumerate(shots, start=1):
+        shot.id = shot.id or idx
+    return [msgspec.to_builtins(shot) for shot in shots]
+
+
+# Batch API status polling: batches take minutes to hours, so back off hard.
+BATCH_POLL_INITIAL_DELAY = 5.0
+BATCH_POLL_MAX_DELAY = 300.0
+
+# Max scenes planned in one multi-scene completion (keeps output in context).
+COVERAGE_MULTI_MAX_SCENES = 10
+
+# Output-token budget for coverage replies, sized to the shot schema.
+COVERAGE_TOKENS_PER_SHOT = 120
+COVERAGE_TOKENS_OVERHEAD = 200
+
+SHOT_SYSTEM_PROMPT = """
 You are a senior cinematographer and shot designer.
 
 Given a scene description, you write ONE highly detailed, camera-aware,
@@ -29,24 +130,187 @@ cinematic shot description. The description should mention:
 
 Return ONLY a single paragraph of natural language description, no bullet points.
 """
-    user_prompt = f"Scene description:\n{scene_text}\n\nWrite one cinematic shot description."
 
-    resp = client.chat.completions.create(
+COVERAGE_SYSTEM_PROMPT = """
+You are a cinematographer planning coverage for a small-to-mid scale production.
+
+The production type may vary: narrative film, YouTube show, interview, commercial,
+live stream, short-form content, etc. Adapt shot choices to the scene and production.
+
+Guidelines:
+- Keep each field to one concise sentence.
+- Efficient coverage: establish the space, key subjects, reactions, cutaways, details.
+- Include at least one shot that shows the ROOM / SPACE LAYOUT.
+- Lighting notes should be practical (soft key, practicals, backlight, etc.).
+- `label` is short but descriptive (used in the UI).
+- Return exactly the requested number of shots.
+"""
+
+
+# Structured Outputs: the reply shape is enforced server-side, so the system
+# prompt doesn't need to describe it. Strict mode requires every property to
+# be listed in "required" and no additional properties.
+_SHOT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        **{
+            name: {"type": "string"}
+            for name in (
+                "label", "shot_type", "description", "camera_angle",
+                "lens", "framing", "lighting", "purpose",
+            )
+        },
+    },
+    "additionalProperties": False,
+}
+_SHOT_SCHEMA["required"] = list(_SHOT_SCHEMA["properties"])
+
+_SHOTS_SCHEMA = {"type": "array", "items": _SHOT_SCHEMA}
+
+COVERAGE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "coverage_pack",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"shots": _SHOTS_SCHEMA},
+            "required": ["shots"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+COVERAGE_MULTI_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "coverage_packs",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "scenes": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "scene_index": {"type": "integer"},
+                            "shots": _SHOTS_SCHEMA,
+                        },
+                        "required": ["scene_index", "shots"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["scenes"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+# Precomputed per-process state for the hot path: the system message dicts
+# (shared, never mutated) and cache-key prefixes derived from model + prompt.
+_SHOT_SYSTEM_MESSAGE = {"role": "system", "content": SHOT_SYSTEM_PROMPT}
+_COVERAGE_SYSTEM_MESSAGE = {"role": "system", "content": COVERAGE_SYSTEM_PROMPT}
+_SHOT_CACHE_NAMESPACE = cache_key(m=settings.openai_model, sys=SHOT_SYSTEM_PROMPT)
+_COVERAGE_PROMPT_KEY = cache_key(
+    m=settings.openai_model, sys=COVERAGE_SYSTEM_PROMPT, fmt=COVERAGE_RESPONSE_FORMAT
+)
+
+COVERAGE_USER_INSTRUCTION = (
+    "Plan the requested number of distinct shots that together cover the scene "
+    "well for this type of production.\n\n"
+)
+
+
+COVERAGE_MULTI_USER_INSTRUCTION = (
+    "Plan coverage for EACH of the numbered scenes below, with the requested "
+    "number of distinct shots per scene. Answer every scene, using the number "
+    "in brackets as its scene_index.\n\n"
+)
+
+
+async def warm_up(timeout: float) -> None:
+    """
+    Open the OpenAI connection pool (DNS + TLS) ahead of the first real
+    request, giving up after `timeout` seconds. Failures are logged and
+    otherwise ignored.
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            await client.models.list()
+    except Exception as e:
+        logger.warning("OpenAI warm-up failed: %s", e)
+
+
+def clear_caches() -> None:
+    """Drop all memoized OpenAI results."""
+    _shot_prompt_cache.clear()
+    _coverage_cache.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters for the OpenAI response caches."""
+    return {
+        _shot_prompt_cache.name: dict(_shot_prompt_cache.stats),
+        _coverage_cache.name: dict(_coverage_cache.stats),
+    }
+
+
+async def build_shot_prompt(scene_text: str, cache: bool = True) -> str:
+    """
+    Turn a single scene/beat into one detailed, camera-aware shot prompt.
+    Used by /api/shot/generate.
+
+    Results are cached by exact request and, if enabled, by semantic
+    similarity of scene_text. Pass cache=False to force a fresh completion.
+    """
+    text = scene_text.strip()
+    key = cache_key(ns=_SHOT_CACHE_NAMESPACE, u=text)
+
+    return await _shot_prompt_cache.get_or_compute(
+        key,
+        _SHOT_CACHE_NAMESPACE,
+        text,
+        lambda: _build_shot_prompt(text),
+        use_cache=cache,
+    )
+
+
+async def build_shot_prompts_batch(scene_texts: List[str]) -> List[str]:
+    """
+    Build shot prompts for many scenes concurrently (bounded by
+    settings.openai_concurrency).
+    """
+    return list(await asyncio.gather(*(build_shot_prompt(s) for s in scene_texts)))
+
+
+async def _build_shot_prompt(scene_text: str) -> str:
+    # Static instruction first, variable scene text last, so the request
+    # prefix stays byte-identical across calls (OpenAI prompt caching).
+    user_prompt = f"Write one cinematic shot description.\n\nScene description:\n{scene_text}"
+
+    resp = await _call(
+        client.chat.completions.create,
         model=settings.openai_model,
         messages=[
-            {"role": "system", "content": system_prompt},
+            _SHOT_SYSTEM_MESSAGE,
             {"role": "user", "content": user_prompt},
         ],
         temperature=0.7,
+        prompt_cache_key=settings.openai_prompt_cache_key,
     )
 
     return resp.choices[0].message.content.strip()
 
 
-def plan_coverage_shots(
+async def plan_coverage_shots(
     scene_text: str,
     num_shots: int = 6,
     project_type: Optional[str] = None,
+    cache: bool = True,
 ) -> List[Dict[str, Any]]:
     """
     Plan a small coverage pack (multiple shots) for a scene.
@@ -58,65 +322,529 @@ def plan_coverage_shots(
     - commercial / corporate
     - documentary / interview
     - or anything else the user specifies via project_type.
+
+    Plans are cached by exact request and, if enabled, by semantic similarity
+    of scene_text (same num_shots / project_type only). Pass cache=False to
+    force a fresh plan.
     """
-    system_prompt = """
-You are a cinematographer planning coverage for a small-to-mid scale production.
+    text = scene_text.strip()
+    key, namespace = _coverage_cache_keys(text, num_shots, project_type)
 
-The production type may vary: narrative film, YouTube show, interview, commercial,
-live stream, short-form content, etc. You must adapt shot choices to the described
-scene and the production context.
-
-You MUST respond with pure JSON of the form:
-
-{
-  "shots": [
-    {
-      "id": 1,
-      "label": "Wide establishing",
-      "shot_type": "wide establishing",
-      "description": "Full view of the environment and key subjects...",
-      "camera_angle": "eye-level, slightly angled toward the host side",
-      "lens": "24mm wide",
-      "framing": "What is inside the frame (how many people, key objects, composition)",
-      "lighting": "Key lighting notes for this shot",
-      "purpose": "What this shot is used for in the edit"
-    },
-    ...
-  ]
-}
+    return await _coverage_cache.get_or_compute(
+        key,
+        namespace,
+        text,
+        lambda: _coverage_batcher.submit(text, num_shots, project_type),
+        use_cache=cache,
+    )
 
-Guidelines:
-- Think in terms of efficient coverage: establish the space, key subjects, reaction shots,
-  useful cutaways, and any important details.
-- Include at least one shot that helps the viewer understand the ROOM / SPACE LAYOUT.
-- Lighting notes should be practical (soft key, motivated by practical lamps, backlight, etc.).
-- `label` should be short but descriptive (good for UI).
-- Limit yourself to the requested number of shots.
-"""
-    context_line = f"\nProduction type: {project_type}\n" if project_type else "\n"
 
+class _CoverageBatcher:
+    """
+    Merges concurrent single-scene coverage requests into multi-scene
+    completions (see `_plan_coverage_group`).
+
+    Requests are grouped by (num_shots, project_type). A group is flushed as
+    soon as it holds `max_size` scenes, or `max_wait` seconds after its first
+    scene arrived, whichever comes first. A lone request therefore waits at
+    most `max_wait`, while under load the system prompt is paid once per
+    batch instead of once per user.
+    """
+
+    def __init__(self, max_size: int, max_wait: float) -> None:
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: Dict[
+            Tuple[int, Optional[str]],
+            List[Tuple[str, "asyncio.Future[List[Dict[str, Any]]]"]],
+        ] = {}
+        self._timers: Dict[Tuple[int, Optional[str]], asyncio.TimerHandle] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def submit(
+        self,
+        scene_text: str,
+        num_shots: int,
+        project_type: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        if self.max_size <= 1 or self.max_wait <= 0:
+            return await _plan_coverage_shots(scene_text, num_shots, project_type)
+
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[List[Dict[str, Any]]]" = loop.create_future()
+        group = (num_shots, project_type)
+        pending = self._pending.setdefault(group, [])
+        pending.append((scene_text, fut))
+
+        if len(pending) >= self.max_size:
+            self._flush(group)
+        elif len(pending) == 1:
+            self._timers[group] = loop.call_later(self.max_wait, self._flush, group)
+
+        return await fut
+
+    def _flush(self, group: Tuple[int, Optional[str]]) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(group, [])
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        group: Tuple[int, Optional[str]],
+        batch: List[Tuple[str, "asyncio.Future[List[Dict[str, Any]]]"]],
+    ) -> None:
+        num_shots, project_type = group
+        planned: Dict[int, Any]
+        try:
+            planned = await _plan_coverage_group(
+                [text for text, _ in batch], num_shots, project_type
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                planned = {0: e}
+            else:
+                # One user's scene (e.g. too long) must not fail the others
+                # merged with it: re-plan every scene on its own below.
+                logger.warning(
+                    "Coverage batch of %d scenes failed, planning singly: %s",
+                    len(batch),
+                    e,
+                )
+                planned = {}
+
+        # Scenes missing from a malformed reply are re-planned one at a time.
+        missing = [j for j in range(len(batch)) if planned.get(j) is None]
+        fallback = await asyncio.gather(
+            *(
+                _plan_coverage_shots(batch[j][0], num_shots, project_type)
+                for j in missing
+            ),
+            return_exceptions=True,
+        )
+        planned.update(zip(missing, fallback))
+
+        for j, (_, fut) in enumerate(batch):
+            if fut.done():  # caller went away
+                continue
+            outcome = planned[j]
+            if isinstance(outcome, BaseException):
+                fut.set_exception(outcome)
+            else:
+                fut.set_result(outcome)
+
+
+_coverage_batcher = _CoverageBatcher(
+    max_size=settings.coverage_batch_max_size,
+    max_wait=settings.coverage_batch_max_wait_ms / 1000,
+)
+
+
+async def stream_coverage_shots(
+    scene_text: str,
+    num_shots: int = 6,
+    project_type: Optional[str] = None,
+    cache: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Like plan_coverage_shots, but yields each shot as soon as the model has
+    finished writing it instead of waiting for the whole plan. Cached plans
+    are replayed immediately (unless cache=False), and a plan the model
+    finished normally is cached afterwards.
+    """
+    text = scene_text.strip()
+    key, _ = _coverage_cache_keys(text, num_shots, project_type)
+
+    if cache:
+        cached = _coverage_cache.get_exact(key)
+        if cached is not None:
+            for shot in cached:
+                yield shot
+            return
+
+    # The completion is drained by its own task, which holds a `_sem` slot
+    # only while OpenAI is writing; a slow reader never keeps a slot busy.
+    queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    producer = asyncio.create_task(
+        _drain_coverage_stream(
+            _scene_coverage_request_body(text, num_shots, project_type), queue
+        )
+    )
+    shots: List[Dict[str, Any]] = []
+    try:
+        while (shot := await queue.get()) is not None:
+            shots.append(shot)
+            yield shot
+        finish_reason = await producer
+    finally:
+        producer.cancel()
+
+    # Truncated (max_tokens) or empty replies are not worth replaying.
+    if finish_reason == "stop" and shots:
+        _coverage_cache.put(key, shots)
+
+
+async def _drain_coverage_stream(
+    body: Dict[str, Any],
+    queue: "asyncio.Queue[Optional[Dict[str, Any]]]",
+) -> Optional[str]:
+    """
+    Stream a coverage completion, putting each finished shot on `queue` and
+    then None. Returns the completion's finish_reason.
+    """
+    parser = _ShotArrayParser()
+    count = 0
+    finish_reason: Optional[str] = None
+    try:
+        stream = await _open_stream(body)
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                if not choice.delta.content:
+                    continue
+                for raw in parser.feed(choice.delta.content):
+                    decoded = msgspec.json.decode(raw, type=Shot, strict=False)
+                    count += 1
+                    decoded.id = decoded.id or count
+                    queue.put_nowait(msgspec.to_builtins(decoded))
+        finally:
+            try:
+                await stream.close()
+            finally:
+                _sem.release()
+    finally:
+        queue.put_nowait(None)
+    return finish_reason
+
+
+class _ShotArrayParser:
+    """
+    Incrementally pulls complete objects out of the `"shots": [...]` array of
+    a JSON document as its text arrives in chunks.
+    """
+
+    _ARRAY_START = re.compile(r'"shots"\s*:\s*\[')
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_start = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add streamed text; return the raw JSON of any newly completed shots."""
+        self._text += chunk
+        completed: List[str] = []
+
+        if not self._in_array:
+            match = self._ARRAY_START.search(self._text)
+            if match is None:
+                return completed
+            self._in_array = True
+            self._pos = match.end()
+
+        text = self._text
+        while not self._done and self._pos < len(text):
+            c = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                if self._depth == 0:
+                    self._obj_start = self._pos
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(text[self._obj_start:self._pos + 1])
+            elif c == "]" and self._depth == 0:
+                self._done = True
+            self._pos += 1
+
+        return completed
+
+
+async def plan_coverage_shots_multi(
+    scenes: List[str],
+    num_shots: int = 6,
+    project_type: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Plan coverage for several scenes with as few completions as possible.
+
+    Uncached scenes are packed up to COVERAGE_MULTI_MAX_SCENES per request,
+    so the shared system prompt is sent (and billed) once per group instead
+    of once per scene. Scenes missing from a malformed reply are re-planned
+    one at a time. Returns one shot list per scene, in input order.
+    """
+    texts = [s.strip() for s in scenes]
+    keys = [_coverage_cache_keys(t, num_shots, project_type)[0] for t in texts]
+    results: List[Optional[List[Dict[str, Any]]]] = [
+        _coverage_cache.get_exact(k) for k in keys
+    ]
+
+    todo = [i for i, r in enumerate(results) if r is None]
+    groups = [
+        todo[g:g + COVERAGE_MULTI_MAX_SCENES]
+        for g in range(0, len(todo), COVERAGE_MULTI_MAX_SCENES)
+    ]
+
+    async def plan_group(group: List[int]) -> None:
+        planned = await _plan_coverage_group(
+            [texts[i] for i in group], num_shots, project_type
+        )
+        missing = [i for j, i in enumerate(group) if planned.get(j) is None]
+        # Straight to single-scene completions: going through
+        # plan_coverage_shots would merge them into another batch.
+        fallback = await asyncio.gather(
+            *(_plan_coverage_shots(texts[i], num_shots, project_type) for i in missing)
+        )
+        for j, i in enumerate(group):
+            if j in planned:
+                _coverage_cache.put(keys[i], planned[j])
+                results[i] = planned[j]
+        for i, shots in zip(missing, fallback):
+            _coverage_cache.put(keys[i], shots)
+            results[i] = shots
+
+    await asyncio.gather(*(plan_group(g) for g in groups))
+
+    return results  # type: ignore[return-value]
+
+
+async def _plan_coverage_group(
+    scene_texts: List[str],
+    num_shots: int,
+    project_type: Optional[str],
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Plan several scenes in one completion. Returns {index in scene_texts:
+    shots} for every scene the model answered with a usable shot list.
+    """
+    if len(scene_texts) == 1:
+        return {0: await _plan_coverage_shots(scene_texts[0], num_shots, project_type)}
+
+    context_line = f"Production type: {project_type}\n" if project_type else ""
+    scenes_block = "\n---\n".join(f"[{i}]\n{t}" for i, t in enumerate(scene_texts))
     user_prompt = (
-        f"Scene description:\n{scene_text}\n"
-        f"{context_line}\n"
-        f"Plan {num_shots} distinct shots that together cover the scene well "
-        f"for this type of production."
+        COVERAGE_MULTI_USER_INSTRUCTION
+        + f"Number of shots per scene: {num_shots}\n"
+        + context_line
+        + f"\nScenes ({len(scene_texts)}):\n{scenes_block}"
     )
 
-    resp = client.chat.completions.create(
-        model=settings.openai_model,
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": system_prompt},
+    body = _coverage_request_body(
+        user_prompt,
+        COVERAGE_TOKENS_PER_SHOT * num_shots * len(scene_texts)
+        + COVERAGE_TOKENS_OVERHEAD,
+        COVERAGE_MULTI_RESPONSE_FORMAT,
+    )
+
+    resp = await _call(client.chat.completions.create, **body)
+
+    try:
+        data = _json_loads(resp.choices[0].message.content)
+    except (TypeError, ValueError):
+        return {}
+
+    planned: Dict[int, List[Dict[str, Any]]] = {}
+    for item in data.get("scenes", []) if isinstance(data, dict) else []:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("scene_index")
+        if not isinstance(idx, int) or not 0 <= idx < len(scene_texts):
+            continue
+        try:
+            shots = msgspec.convert(item.get("shots"), List[Shot], strict=False)
+        except msgspec.ValidationError:
+            continue
+        if shots:
+            planned[idx] = _shots_to_dicts(shots)
+
+    return planned
+
+
+async def plan_coverage_shots_batch(
+    scenes: List[str],
+    num_shots: int = 6,
+    project_type: Optional[str] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Plan coverage for many scenes through the OpenAI Batch API.
+
+    Batch jobs cost roughly half as much and have separate rate limits, but
+    can take up to 24h, so this is meant for bulk planning (e.g. a whole
+    script) run as a background job. Returns one shot list per scene, in
+    input order. Scenes the batch fails to answer are re-planned in real time.
+    """
+    texts = [s.strip() for s in scenes]
+    keys = [_coverage_cache_keys(t, num_shots, project_type)[0] for t in texts]
+    results: List[Optional[List[Dict[str, Any]]]] = [
+        _coverage_cache.get_exact(k) for k in keys
+    ]
+
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        lines = [
+            json.dumps({
+                "custom_id": f"scene-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _scene_coverage_request_body(texts[i], num_shots, project_type),
+            })
+            for i in todo
+        ]
+        batch_input = ("\n".join(lines) + "\n").encode("utf-8")
+
+        input_file = await _call(
+            client.files.create,
+            file=("coverage_batch.jsonl", batch_input),
+            purpose="batch",
+        )
+        batch = await _call(
+            client.batches.create,
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+        delay = BATCH_POLL_INITIAL_DELAY
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(delay)
+            delay = min(BATCH_POLL_MAX_DELAY, delay * 2)
+            batch = await _call(client.batches.retrieve, batch.id)
+
+        if batch.status != "completed":
+            logger.warning(
+                "Coverage batch %s ended %s: %s", batch.id, batch.status, batch.errors
+            )
+
+        try:
+            await _call(client.files.delete, input_file.id)
+        except Exception as e:
+            logger.warning("Could not delete batch input file %s: %s", input_file.id, e)
+
+        if batch.output_file_id:
+            output = await _call(client.files.content, batch.output_file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                item = _json_loads(line)
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    continue
+                i = int(item["custom_id"].rsplit("-", 1)[1])
+                try:
+                    content = response["body"]["choices"][0]["message"]["content"]
+                    shots = _parse_coverage_content(content)
+                except (KeyError, IndexError, TypeError, ValueError):
+                    # TypeError: content is null when the model refused.
+                    continue
+                _coverage_cache.put(keys[i], shots)
+                results[i] = shots
+
+    # Anything the batch didn't answer (failed / expired items) goes real-time.
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        logger.warning(
+            "Coverage batch left %d of %d scenes unanswered; planning them in real time",
+            len(missing),
+            len(texts),
+        )
+        fallback = await asyncio.gather(
+            *(plan_coverage_shots(texts[i], num_shots, project_type) for i in missing)
+        )
+        for i, shots in zip(missing, fallback):
+            results[i] = shots
+
+    return results  # type: ignore[return-value]
+
+
+def _coverage_cache_keys(
+    scene_text: str,
+    num_shots: int,
+    project_type: Optional[str],
+) -> Tuple[str, str]:
+    """(exact key, semantic namespace) for a coverage request."""
+    namespace = cache_key(p=_COVERAGE_PROMPT_KEY, n=num_shots, pt=project_type)
+    return cache_key(ns=namespace, u=scene_text), namespace
+
+
+def _coverage_request_body(
+    user_prompt: str,
+    max_tokens: int,
+    response_format: Dict[str, Any] = COVERAGE_RESPONSE_FORMAT,
+) -> Dict[str, Any]:
+    """Chat completion request body for a coverage-planning prompt."""
+    return {
+        "model": settings.openai_model,
+        "response_format": response_format,
+        "messages": [
+            _COVERAGE_SYSTEM_MESSAGE,
             {"role": "user", "content": user_prompt},
         ],
-        temperature=0.7,
+        "temperature": 0.5,
+        "top_p": 0.9,
+        "max_tokens": max_tokens,
+        "prompt_cache_key": settings.openai_prompt_cache_key,
+    }
+
+
+def _scene_coverage_request_body(
+    scene_text: str,
+    num_shots: int,
+    project_type: Optional[str],
+) -> Dict[str, Any]:
+    """Chat completion request body for planning one scene's coverage."""
+    # Static instruction first and all variable content at the end, so the
+    # request prefix stays byte-identical across calls (OpenAI prompt caching).
+    context_line = f"Production type: {project_type}\n" if project_type else ""
+
+    user_prompt = (
+        COVERAGE_USER_INSTRUCTION
+        + f"Number of shots: {num_shots}\n"
+        + context_line
+        + f"\nScene description:\n{scene_text}"
     )
 
-    content = resp.choices[0].message.content
-    data = json.loads(content)
+    return _coverage_request_body(
+        user_prompt,
+        COVERAGE_TOKENS_PER_SHOT * num_shots + COVERAGE_TOKENS_OVERHEAD,
+    )
 
-    shots = data.get("shots", [])
-    for idx, shot in enumerate(shots, start=1):
-        shot.setdefault("id", idx)
 
-    return shots
+def _parse_coverage_content(content: str) -> List[Dict[str, Any]]:
+    """Decode and validate a `{"shots": [...]}` reply in one pass."""
+    pack = msgspec.json.decode(content, type=CoveragePack, strict=False)
+    return _shots_to_dicts(pack.shots)
+
+
+async def _plan_coverage_shots(
+    scene_text: str,
+    num_shots: int,
+    project_type: Optional[str],
+) -> List[Dict[str, Any]]:
+    resp = await _call(
+        client.chat.completions.create,
+        **_scene_coverage_request_body(scene_text, num_shots, project_type),
+    )
+
+    return _parse_coverage_content(resp.choices[0].message.content)
@@ -1,38 +1,134 @@
+import asyncio
+import hashlib
+import logging
+import logging.handlers
+import queue
+import sys
 import time
-import json
+from typing import Optional
+
+import diskcache
 import httpx
+import orjson
 from app.config import settings  # loads .env
+from app.retry import retry_transient, retry_unsent
+
+log = logging.getLogger("bria_test")
+
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so the console write happens on a
+    background thread, not in the event loop's polling path. Returns the
+    started listener; call `.stop()` on exit to flush it.
+    """
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    listener = logging.handlers.QueueListener(q, console)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    log.setLevel(level)
+    log.propagate = False
+    listener.start()
+    return listener
+
+
+# Pooled HTTP/2 client shared by every call so polls reuse connections
+# instead of paying a TCP + TLS handshake each time.
+_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    timeout=httpx.Timeout(30.0),
+)
+
+
+# Resolved once at import; only the submit POST carries a body, so that
+# call adds its own Content-Type.
+_BRIA_SUBMIT_URL = settings.bria_submit_url
+_BRIA_HEADERS = {"api_token": settings.bria_api_key}
+_BRIA_JSON_HEADERS = {**_BRIA_HEADERS, "Content-Type": "application/json"}
+
 
+# Finished generations persisted on disk for a week, keyed by prompt hash, so
+# re-running the same prompt skips the Bria round trip entirely.
+BRIA_CACHE_TAG = "bria"
+BRIA_CACHE_EXPIRE = 7 * 86400
+_cache = diskcache.Cache("./.cache/bria")
 
-def bria_generate(prompt: str):
-    headers = {
-        "api_token": settings.bria_api_key,
-        "Content-Type": "application/json",
-    }
 
-    base = settings.bria_api_base.rstrip("/")
-    submit_url = f"{base}/image/generate"
-    payload = {"prompt": prompt, "num_results": 1}
+def clear_bria_cache() -> int:
+    """Drop all cached generations; returns how many were removed."""
+    return _cache.evict(BRIA_CACHE_TAG)
 
-    print("➡️ Sending request to Bria...")
-    r = httpx.post(submit_url, json=payload, headers=headers, timeout=30)
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    r = await client.request(method, url, **kwargs)
     r.raise_for_status()
-    data = r.json()
+    return r
+
+
+# Status polls are idempotent and retried broadly; the submit POST only when
+# Bria can't have started the job, so a retry never bills a duplicate.
+_poll = retry_transient(_send)
+_submit = retry_unsent(_send)
+
+
+def _server_poll_hint(resp: httpx.Response, body: dict) -> Optional[float]:
+    """
+    Next poll delay suggested by Bria (Retry-After or an ETA field), if any,
+    kept within the configured initial..max polling interval.
+    """
+    for raw in (
+        resp.headers.get("retry-after"),
+        body.get("estimated_completion_seconds"),
+        body.get("eta"),
+    ):
+        try:
+            hint = float(raw)
+        except (TypeError, ValueError):
+            continue
+        return min(
+            max(hint, settings.bria_poll_interval_initial),
+            settings.bria_poll_interval_max,
+        )
+    return None
+
+
+async def bria_generate(
+    prompt: str,
+    client: Optional[httpx.AsyncClient] = None,
+    force_refresh: bool = False,
+):
+    cache_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    if not force_refresh:
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            log.info("Cache hit, skipping Bria.")
+            return cached
+
+    client = client or _client
+    body = orjson.dumps({"prompt": prompt, "num_results": 1})
+
+    log.debug("Sending request to Bria...")
+    started = time.perf_counter()
+    r = await _submit(
+        client, "POST", _BRIA_SUBMIT_URL, content=body, headers=_BRIA_JSON_HEADERS
+    )
+    data = orjson.loads(r.content)
 
-    print("🔹 Submitted!")
     request_id = data["request_id"]
     status_url = data["status_url"]
-    print("request_id:", request_id)
-    print("status_url:", status_url)
+    log.debug("Submitted request_id=%s status_url=%s", request_id, status_url)
 
-    print("\n⏳ Polling for result...")
+    delay = settings.bria_poll_interval_initial
+    polls = 0
     while True:
-        s = httpx.get(status_url, headers=headers, timeout=30)
-        s.raise_for_status()
-        sd = s.json()
+        polls += 1
+        s = await _poll(client, "GET", status_url, headers=_BRIA_HEADERS)
+        sd = orjson.loads(s.content)
 
         status = sd.get("status", "")
-        print("Status:", status)
+        log.debug("request_id=%s poll=%d status=%s", request_id, polls, status)
 
         if status.upper() == "COMPLETED":
             result = sd.get("result", {})
@@ -45,9 +141,9 @@ def bria_generate(prompt: str):
                 structured_parsed = structured_raw
             elif isinstance(structured_raw, str):
                 try:
-                    structured_parsed = json.loads(structured_raw)
+                    structured_parsed = orjson.loads(structured_raw)
                 except Exception:
-                    print("\n⚠️ structured_prompt is a string but not valid JSON, keeping raw.")
+                    log.warning("structured_prompt is a string but not valid JSON, dropping it.")
                     structured_parsed = {}
 
             if not image_url:
@@ -55,25 +151,81 @@ def bria_generate(prompt: str):
                     f"✅ Completed but no image_url in result:\n{sd}"
                 )
 
-            return {
+            result = {
                 "image_url": image_url,
                 "structured_prompt": structured_parsed,
                 "request_id": request_id,
             }
+            log.info(
+                "request_id=%s completed after %d polls in %.1fs",
+                request_id, polls, time.perf_counter() - started,
+            )
+            _cache.set(cache_key, result, expire=BRIA_CACHE_EXPIRE, tag=BRIA_CACHE_TAG)
+            return result
 
         if status.upper() == "ERROR":
             raise RuntimeError(f"❌ Generation failed:\n{sd}")
 
-        time.sleep(2)
+        # Prefer Bria's own hint; otherwise back off 1.5x up to the cap.
+        hint = _server_poll_hint(s, sd)
+        await asyncio.sleep(delay if hint is None else hint)
+        delay = min(delay * 1.5, settings.bria_poll_interval_max)
+
+
+async def generate_coverage_images(
+    shots,
+    max_concurrency: int = 6,
+    client: Optional[httpx.AsyncClient] = None,
+):
+    """
+    Render every planned shot concurrently (at most `max_concurrency` Bria
+    jobs at once). Failed shots are retried once, individually; anything that
+    still fails is returned as its exception rather than aborting the pack.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def one(shot):
+        async with sem:
+            return await bria_generate(shot["description"], client)
+
+    results = await asyncio.gather(*(one(s) for s in shots), return_exceptions=True)
+
+    failed = [i for i, r in enumerate(results) if isinstance(r, Exception)]
+    if failed:
+        log.info("Retrying %d failed shot(s)...", len(failed))
+        retried = await asyncio.gather(
+            *(one(shots[i]) for i in failed), return_exceptions=True
+        )
+        for i, r in zip(failed, retried):
+            results[i] = r
+
+    return results
+
+
+async def main(prompts):
+    # Each prompt is rendered as one shot of a coverage pack.
+    async with _client:
+        return await generate_coverage_images([{"description": p} for p in prompts])
 
 
 if __name__ == "__main__":
+    listener = setup_logging()
     test_prompt = "A cinematic wide shot of a cozy living room with warm lighting."
-    result = bria_generate(test_prompt)
-
-    print("\n✅ SUCCESS — FIBO Responded!")
-    print("Image URL:", result["image_url"])
-    print("Request ID:", result["request_id"])
-    sp = result["structured_prompt"]
-    print("Structured Prompt Type:", type(sp).__name__)
-    print("Structured Prompt Keys:", list(sp.keys()))
+    prompts = sys.argv[1:] or [test_prompt]
+    try:
+        results = asyncio.run(main(prompts))
+    finally:
+        listener.stop()
+
+    for prompt, result in zip(prompts, results):
+        if isinstance(result, Exception):
+            print(f"\n❌ FAILED — {prompt!r}: {result}")
+            continue
+        print(f"\n✅ SUCCESS — FIBO Responded for {prompt!r}")
+        print("Image URL:", result["image_url"])
+        print("Request ID:", result["request_id"])
+        sp = result["structured_prompt"]
+        print("Structured Prompt Type:", type(sp).__name__)
+        print("Structured Prompt Keys:", list(sp.keys()))
+
+    sys.exit(any(isinstance(r, Exception) for r in results))